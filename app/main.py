@@ -1,11 +1,47 @@
 import cv2
 import os
 import concurrent.futures
+import multiprocessing
 import argparse
 import sys
-import numpy as np  # Added for frame comparison
+import ctypes
+import ctypes.util
+import logging
+import queue
+import threading
+from collections import deque
+import numpy as np
 from tqdm import tqdm  # added for progress bar
 
+logger = logging.getLogger(__name__)
+LOG_FORMAT = "%(message)s"
+
+# libjpeg-turbo encoder for JPEG output, created once per process; falls back to cv2.imencode
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420, TJSAMP_422, TJSAMP_444
+    _tj = TurboJPEG()
+    TURBOJPEG_SUBSAMPLING = {"420": TJSAMP_420, "422": TJSAMP_422, "444": TJSAMP_444}
+except (ImportError, RuntimeError, OSError):
+    _tj = None
+
+# Per-process queue feeding a background writer thread, set up by init_worker so disk writes
+# overlap with encoding the next frame; None means files are written synchronously
+_io_queue = None
+
+# Optional PyAV bindings for the fused FFmpeg backend
+try:
+    import av
+except ImportError:
+    av = None
+
+# libc memcmp for the exact-duplicate check; it stops at the first differing byte
+try:
+    _memcmp = ctypes.CDLL(ctypes.util.find_library("c") or "msvcrt").memcmp
+    _memcmp.argtypes = (ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t)
+    _memcmp.restype = ctypes.c_int
+except (OSError, AttributeError):
+    _memcmp = None
+
 # New mapping for interpolation methods
 INTERPOLATION_MAP = {
     "linear": cv2.INTER_LINEAR,
@@ -14,21 +50,390 @@ INTERPOLATION_MAP = {
     "area": cv2.INTER_AREA,
 }
 
-def process_and_save(frame, frame_id, scale_factor, output_folder, img_format, overlay_timestamp, current_time, interpolation):
+# Chroma subsampling modes for the cv2.imencode JPEG fallback and the FFmpeg mjpeg encoder
+CV2_JPEG_SUBSAMPLING = {
+    "420": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420,
+    "422": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_422,
+    "444": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_444,
+}
+FFMPEG_JPEG_PIX_FMTS = {"420": "yuvj420p", "422": "yuvj422p", "444": "yuvj444p"}
+
+# swscale flags matching INTERPOLATION_MAP for the FFmpeg backend
+FFMPEG_SCALE_FLAGS = {
+    "linear": "bilinear",
+    "nearest": "neighbor",
+    "cubic": "bicubic",
+    "area": "area",
+}
+
+# Frames are compared for similarity on thumbnails of this size
+SIMILARITY_THUMBNAIL_SIZE = (64, 64)
+
+# Frames handed to a worker per task, amortizing pickling and IPC overhead across the batch
+BATCH_SIZE = 4
+
+# Number of recently saved frames whose dHash a new frame is compared against
+DHASH_WINDOW = 16
+
+# Bitwise metric: gray level that splits flat thumbnails, and the gray range above which Otsu picks the level
+BITWISE_LEVEL = 128
+BITWISE_MIN_CONTRAST = 32
+
+def frames_identical(frame, other):
+    """
+    Return True if the two frames are byte-identical.
+    """
+    if frame.shape != other.shape:
+        return False
+    if _memcmp is not None and frame.flags.c_contiguous and other.flags.c_contiguous:
+        return _memcmp(frame.ctypes.data, other.ctypes.data, frame.nbytes) == 0
+    return np.array_equal(frame, other)
+
+
+def process_batch(batch, dsize, path_template, img_format, overlay_timestamp, interpolation, jpeg_quality, jpeg_subsample, overlay_scale=1.0):
+    """
+    Run process_and_save on a list of (frame, frame_id, current_time) tuples in one worker task.
+    """
+    for frame, frame_id, current_time in batch:
+        process_and_save(
+            frame, frame_id, dsize, path_template, img_format, overlay_timestamp, current_time, interpolation,
+            jpeg_quality, jpeg_subsample, overlay_scale
+        )
+    # The task only completes once its files are on disk
+    if _io_queue is not None:
+        _io_queue.join()
+
+
+def dhash(frame):
+    """
+    Return the 64-bit difference hash of a frame: the signs of the horizontal gradients
+    of a 9x8 grayscale thumbnail, packed into an int.
+    """
+    small = cv2.cvtColor(cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def make_duplicate_check(similarity_metric, similarity_threshold):
+    """
+    Return a function frame -> bool telling whether the frame duplicates recently saved frames.
+    Frames it accepts become the reference for the next comparisons.
+    """
+    if similarity_threshold <= 0:
+        # A threshold of 0 only skips exact duplicates, which a memcmp finds without computing an MSE
+        previous_frame = None
+
+        def is_exact_duplicate(frame):
+            nonlocal previous_frame
+            if previous_frame is not None and frames_identical(frame, previous_frame):
+                return True
+            # Frames are never modified in this process, so keeping a reference is enough
+            previous_frame = frame
+            return False
+
+        return is_exact_duplicate
+
+    if similarity_metric == "dhash":
+        recent_hashes = deque(maxlen=DHASH_WINDOW)
+
+        def is_dhash_duplicate(frame):
+            # Hamming distance to any recently saved frame, so near-duplicates a few frames apart are caught too
+            current_hash = dhash(frame)
+            for previous_hash in recent_hashes:
+                if (current_hash ^ previous_hash).bit_count() < similarity_threshold:
+                    return True
+            recent_hashes.append(current_hash)
+            return False
+
+        return is_dhash_duplicate
+
+    if similarity_metric == "bitwise":
+        previous_bits = None
+
+        def is_bitwise_duplicate(frame):
+            nonlocal previous_bits
+            # Black/white thumbnail; the share of pixels that changed is counted with xor + countNonZero.
+            # Thumbnails with real contrast are split at their Otsu level so dark scenes still binarize,
+            # flat ones (black screens, blank slides) at a fixed level so their noise cannot flip pixels
+            small = cv2.resize(frame, SIMILARITY_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            low, high, _, _ = cv2.minMaxLoc(gray)
+            if high - low > BITWISE_MIN_CONTRAST:
+                _, bits = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+            else:
+                _, bits = cv2.threshold(gray, BITWISE_LEVEL, 255, cv2.THRESH_BINARY)
+            if previous_bits is not None:
+                changed = cv2.countNonZero(cv2.bitwise_xor(bits, previous_bits)) / bits.size
+                if changed < similarity_threshold:
+                    return True
+            previous_bits = bits
+            return False
+
+        return is_bitwise_duplicate
+
+    # Two preallocated thumbnail buffers used in turn: one holds the last saved frame, the other the current one
+    thumbnails = [np.empty((*SIMILARITY_THUMBNAIL_SIZE[::-1], 3), dtype=np.uint8) for _ in range(2)]
+    thumbnail_index = 0
+    previous_small = None
+
+    def is_mse_duplicate(frame):
+        nonlocal thumbnail_index, previous_small
+        current_small = cv2.resize(
+            frame, SIMILARITY_THUMBNAIL_SIZE, dst=thumbnails[thumbnail_index], interpolation=cv2.INTER_AREA
+        )
+        if previous_small is not None:
+            # Sum of squared differences in a single uint8 pass, no float temporaries
+            mse = cv2.norm(current_small, previous_small, cv2.NORM_L2SQR) / current_small.size
+            if mse < similarity_threshold:
+                return True
+        previous_small = current_small
+        thumbnail_index ^= 1
+        return False
+
+    return is_mse_duplicate
+
+
+def write_file(filename, data):
     """
-    Resize the frame using the given scale factor and save it as an image.
+    Write an encoded image buffer to filename with unbuffered os.write calls.
+    """
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(data).cast("B")
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    logger.debug("Saved %s", filename)
+
+
+def writer_loop(io_queue):
+    """
+    Background thread body: write (filename, data) items from io_queue until the process exits.
+    """
+    while True:
+        filename, data = io_queue.get()
+        try:
+            write_file(filename, data)
+        except OSError as e:
+            logger.error("Failed to write %s: %s", filename, e)
+        finally:
+            io_queue.task_done()
+
+
+def init_worker(log_level=logging.WARNING, worker_counter=None):
+    """
+    Pool initializer: keep OpenCV single-threaded so the pool alone owns the parallelism,
+    apply the parent's log level (spawned workers do not inherit logging config),
+    pin each worker to its own CPU where the OS supports it, and start the writer thread.
+    """
+    global _io_queue
+    _io_queue = queue.Queue()
+    threading.Thread(target=writer_loop, args=(_io_queue,), daemon=True).start()
+    cv2.setNumThreads(1)
+    logging.basicConfig(level=log_level, format=LOG_FORMAT)
+    if worker_counter is not None and hasattr(os, "sched_setaffinity"):
+        with worker_counter.get_lock():
+            worker_index = worker_counter.value
+            worker_counter.value += 1
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[worker_index % len(cpus)]})
+
+
+def process_and_save(frame, frame_id, dsize, path_template, img_format, overlay_timestamp, current_time, interpolation, jpeg_quality=90, jpeg_subsample="420", overlay_scale=1.0):
+    """
+    Resize the frame to dsize (width, height) and save it as an image at path_template.format(frame_id).
+    JPEGs are baseline with standard Huffman tables, at the given quality and chroma subsampling.
+    Frames that arrive already resized pass the scale factor as overlay_scale so the timestamp keeps its size.
     """
     # Optionally overlay the timestamp
     if overlay_timestamp:
         text = f"{current_time:.2f}s"
-        cv2.putText(frame, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        org = (round(10 * overlay_scale), round(30 * overlay_scale))
+        thickness = max(1, round(2 * overlay_scale))
+        cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX, overlay_scale, (0, 255, 0), thickness)
     height, width = frame.shape[:2]
-    new_width = int(width * scale_factor)
-    new_height = int(height * scale_factor)
-    resized_frame = cv2.resize(frame, (new_width, new_height), interpolation=interpolation)
-    filename = os.path.join(output_folder, f"frame_{frame_id:06d}.{img_format}")
-    cv2.imwrite(filename, resized_frame)
-    print(f"Saved {filename}")
+    if dsize != (width, height):
+        resized_frame = cv2.resize(frame, dsize, interpolation=interpolation)
+    else:
+        resized_frame = frame
+    filename = path_template.format(frame_id)
+    if img_format == "jpg" and _tj is not None:
+        data = _tj.encode(
+            resized_frame, quality=jpeg_quality, pixel_format=TJPF_BGR,
+            jpeg_subsample=TURBOJPEG_SUBSAMPLING[jpeg_subsample]
+        )
+    elif img_format == "jpg":
+        _, data = cv2.imencode(".jpg", resized_frame, [
+            cv2.IMWRITE_JPEG_QUALITY, jpeg_quality,
+            cv2.IMWRITE_JPEG_SAMPLING_FACTOR, CV2_JPEG_SUBSAMPLING[jpeg_subsample],
+            cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+            cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+        ])
+    else:
+        _, data = cv2.imencode(".png", resized_frame)
+    # Encoding is done; hand the buffer to the writer thread and move on to the next frame
+    if _io_queue is not None:
+        _io_queue.put((filename, data))
+    else:
+        write_file(filename, data)
+
+
+def iter_sampled_frames(cap, start_frame, end_frame, skip_frames):
+    """
+    Yield (frame_index, frame) for every skip_frames-th frame in [start_frame, end_frame).
+    Seeks once, then only grab()s the frames in between so they are never converted to BGR.
+    """
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    frame_index = start_frame
+    while frame_index < end_frame:
+        if not cap.grab():
+            break
+        if (frame_index - start_frame) % skip_frames == 0:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            yield frame_index, frame
+        frame_index += 1
+
+
+def cuda_available():
+    """
+    Return True if OpenCV was built with cudacodec and a CUDA device is present.
+    """
+    return hasattr(cv2, "cudacodec") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+
+
+def iter_sampled_frames_cuda(video_path, start_frame, end_frame, skip_frames, dsize, interpolation):
+    """
+    GPU counterpart of iter_sampled_frames: decodes on NVDEC and resizes on the GPU to dsize.
+    Only the resized sampled frames are downloaded to host memory.
+    """
+    reader = cv2.cudacodec.createVideoReader(video_path)
+    frame_index = 0
+    while frame_index < end_frame:
+        if frame_index < start_frame or (frame_index - start_frame) % skip_frames != 0:
+            if not reader.grab():
+                break
+        else:
+            ret, gpu_frame = reader.nextFrame()
+            if not ret:
+                break
+            gpu_frame = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR)
+            if gpu_frame.size() != dsize:
+                gpu_frame = cv2.cuda.resize(gpu_frame, dsize, interpolation=interpolation)
+            yield frame_index, gpu_frame.download()
+        frame_index += 1
+
+
+def stream_start_seconds(stream):
+    """
+    Return the timestamp of the first frame of stream in seconds. Frame timestamps are absolute,
+    while start_time and end_time count from the start of the video as in the OpenCV path.
+    """
+    if stream.start_time is None:
+        return 0.0
+    return float(stream.start_time * stream.time_base)
+
+
+def build_ffmpeg_graph(stream, start_frame, end_frame, skip_frames, fps, dsize, interpolation_method, pix_fmt):
+    """
+    Build a PyAV filter graph that selects every skip_frames-th frame in [start_frame, end_frame)
+    and scales them to dsize in pix_fmt.
+    """
+    graph = av.filter.Graph()
+    filters = [graph.add_buffer(template=stream)]
+    # Same frame numbering and step as iter_sampled_frames, derived from the timestamp relative to the first frame
+    n = f"round((t-{stream_start_seconds(stream)})*{fps})"
+    filters.append(graph.add(
+        "select",
+        f"gte({n},{start_frame})*lt({n},{end_frame})*not(mod({n}-{start_frame},{skip_frames}))",
+    ))
+    filters.append(graph.add(
+        "scale", f"{dsize[0]}:{dsize[1]}:flags={FFMPEG_SCALE_FLAGS.get(interpolation_method, 'bilinear')}"
+    ))
+    filters.append(graph.add("format", pix_fmt))
+    filters.append(graph.add("buffersink"))
+    for upstream, downstream in zip(filters, filters[1:]):
+        upstream.link_to(downstream)
+    graph.configure()
+    return graph
+
+
+def iter_filtered_frames(container, stream, graph, start_time, end_time):
+    """
+    Decode stream from start_time to end_time, push every frame through graph and yield its output frames.
+    """
+    def drain():
+        while True:
+            try:
+                yield graph.pull()
+            except (BlockingIOError, EOFError):
+                return
+
+    stream.thread_type = "AUTO"
+    stream_start = stream_start_seconds(stream)
+    if start_time > 0:
+        container.seek(int((stream_start + start_time) / stream.time_base), stream=stream)
+    for frame in container.decode(stream):
+        if frame.time is not None and frame.time - stream_start >= end_time:
+            break
+        graph.push(frame)
+        yield from drain()
+    graph.push(None)
+    yield from drain()
+
+
+def iter_sampled_frames_ffmpeg(video_path, start_time, end_time, start_frame, end_frame, skip_frames, fps, dsize, interpolation_method):
+    """
+    PyAV counterpart of iter_sampled_frames: FFmpeg's scaler converts each sampled frame to BGR
+    at dsize in one pass, so frames are never materialized at full resolution.
+    """
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        graph = build_ffmpeg_graph(stream, start_frame, end_frame, skip_frames, fps, dsize, interpolation_method, "bgr24")
+        stream_start = stream_start_seconds(stream)
+        for frame in iter_filtered_frames(container, stream, graph, start_time, end_time):
+            yield int(round((frame.time - stream_start) * fps)), frame.to_ndarray()
+
+
+def extract_frames_ffmpeg(video_path, path_template, dsize, start_time, end_time, start_frame, end_frame, skip_frames, fps, img_format, interpolation_method, total_steps, jpeg_quality, jpeg_subsample):
+    """
+    Run decode -> select -> scale -> encode inside a single FFmpeg filter graph via PyAV,
+    writing each encoded frame straight to disk without converting it to a NumPy array.
+    Returns the number of saved frames.
+    """
+    if img_format == "jpg":
+        codec_name, pix_fmt = "mjpeg", FFMPEG_JPEG_PIX_FMTS[jpeg_subsample]
+    else:
+        codec_name, pix_fmt = "png", "rgb24"
+    encoder = av.CodecContext.create(codec_name, "w")
+    encoder.width, encoder.height = dsize
+    encoder.pix_fmt = pix_fmt
+    if codec_name == "mjpeg":
+        # Fixed quantizer instead of the default 200 kb/s rate control; quality 90 maps to qscale 2
+        qscale = max(1, round((100 - jpeg_quality) / 5))
+        encoder.options = {"flags": "+qscale", "global_quality": str(qscale * 118)}
+
+    saved_frame_count = 0
+
+    def write_packets(packets):
+        nonlocal saved_frame_count
+        for packet in packets:
+            filename = path_template.format(saved_frame_count)
+            write_file(filename, bytes(packet))
+            saved_frame_count += 1
+
+    with av.open(video_path) as container, tqdm(total=total_steps, desc="Extracting frames") as pbar:
+        stream = container.streams.video[0]
+        encoder.time_base = stream.time_base
+        graph = build_ffmpeg_graph(stream, start_frame, end_frame, skip_frames, fps, dsize, interpolation_method, pix_fmt)
+        for frame in iter_filtered_frames(container, stream, graph, start_time, end_time):
+            write_packets(encoder.encode(frame))
+            # The graph drops nothing after select, so every output frame is one sampled input frame
+            pbar.update(1)
+        write_packets(encoder.encode(None))
+    return saved_frame_count
 
 
 def extract_frames(
@@ -42,10 +447,18 @@ def extract_frames(
     ignore_similarity=False,  # New parameter to toggle similarity check
     img_format="jpg",
     overlay_timestamp=False,
-    interpolation_method="linear"
+    interpolation_method="auto",
+    similarity_metric="mse",
+    jpeg_quality=90,
+    jpeg_subsample="420",
+    device="cpu",
+    backend="opencv"
 ):
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
+    # Output file names are built once; braces in the folder name are escaped for str.format
+    escaped_folder = output_folder.replace("{", "{{").replace("}", "}}")
+    path_template = os.path.join(escaped_folder, "frame_{:06d}." + img_format)
 
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
@@ -80,74 +493,106 @@ def extract_frames(
 
     print(f"Video duration: {duration:.2f} seconds, FPS: {fps:.2f}")
     print(f"Extracting frames from {start_time} s to {end_time} s with a step of {frame_step} s")
-    num_cores = os.cpu_count() or 1
-    print(f"Using {num_cores} threads for processing.")
+
+    # Workers pin themselves to the CPUs this process may use, so size the pool to that set
+    if hasattr(os, "sched_getaffinity"):
+        num_cores = len(os.sched_getaffinity(0))
+    else:
+        num_cores = os.cpu_count() or 1
 
     # Calculate frame indices and skip count
     start_frame = int(start_time * fps)
     end_frame = int(end_time * fps)
-    skip_frames = max(1, int(frame_step * fps))
-    total_steps = (end_frame - start_frame) // skip_frames
+    skip_frames = max(1, int(round(frame_step * fps)))
+    total_steps = -(-(end_frame - start_frame) // skip_frames)
+
+    # The output size is the same for every frame, so compute it once instead of per frame in the workers
+    if interpolation_method == "auto":
+        # Area averaging is both sharper and faster than bilinear when shrinking
+        interpolation_method = "area" if scale_factor < 1.0 else "linear"
+    interpolation = INTERPOLATION_MAP.get(interpolation_method, cv2.INTER_LINEAR)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    dsize = (int(width * scale_factor), int(height * scale_factor))
+
+    if backend == "ffmpeg" and av is None:
+        print("PyAV is not installed, falling back to the OpenCV backend.")
+        backend = "opencv"
+    if backend == "ffmpeg":
+        # Without a timestamp overlay or a similarity check, FFmpeg can do everything. The similarity check
+        # always runs in Python so --similarity_metric and --similarity_threshold mean the same on both backends
+        if not overlay_timestamp and ignore_similarity:
+            cap.release()
+            saved_frame_count = extract_frames_ffmpeg(
+                video_path, path_template, dsize, start_time, end_time, start_frame, end_frame, skip_frames, fps,
+                img_format, interpolation_method, total_steps, jpeg_quality, jpeg_subsample
+            )
+            print("Finished extracting frames.")
+            print(f"Summary: Saved frames: {saved_frame_count}")
+            return
+        # Otherwise FFmpeg still decodes straight to dsize and the frames go through the worker pool
+        overlay_scale = scale_factor
+        frames = iter_sampled_frames_ffmpeg(
+            video_path, start_time, end_time, start_frame, end_frame, skip_frames, fps, dsize, interpolation_method
+        )
+    else:
+        if device == "cuda" and not cuda_available():
+            print("CUDA video decoding is not available in this OpenCV build, falling back to CPU.")
+            device = "cpu"
+        if device == "cuda":
+            # Frames come back from the GPU already at dsize, so workers only encode them
+            frames = iter_sampled_frames_cuda(video_path, start_frame, end_frame, skip_frames, dsize, interpolation)
+            overlay_scale = scale_factor
+        else:
+            frames = iter_sampled_frames(cap, start_frame, end_frame, skip_frames)
+            overlay_scale = 1.0
+    print(f"Using {num_cores} worker processes for processing.")
+
+    # Each worker already runs on its own core; nested OpenCV/OpenMP threads would only contend
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    cv2.setNumThreads(1)
 
-    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-    current_frame_index = start_frame
     processed_count = 0
     skipped_count = 0
     saved_frame_count = 0
-    previous_frame = None  # For similarity comparison
-    futures = []
+    # The similarity check is specialized once here so the capture loop makes a single call per frame
+    is_duplicate = None if ignore_similarity else make_duplicate_check(similarity_metric, similarity_threshold)
+    # Bound the batches in flight so memory stays O(num_cores) while decode overlaps with the workers
+    max_pending = 2 * num_cores
+    pending = set()
+    batch = []
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_cores) as executor, tqdm(total=total_steps, desc="Extracting frames") as pbar:
-        while current_frame_index < end_frame:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            current_time = current_frame_index / fps
-
-            if not ignore_similarity and previous_frame is not None:
-                # Optimized similarity check via cv2.absdiff
-                diff = cv2.absdiff(frame, previous_frame)
-                mse = np.mean(diff.astype(np.float32) ** 2)
-                if mse < similarity_threshold:
-                    skipped_count += 1
-                    # Skip remaining frames for this interval using grab()
-                    for _ in range(skip_frames - 1):
-                        if cap.grab():
-                            current_frame_index += 1
-                        else:
-                            break
-                    current_frame_index += 1
-                    pbar.update(1)
-                    continue
-
-            previous_frame = frame.copy()
+    def submit_batch(executor, batch):
+        if len(pending) >= max_pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            pending.difference_update(done)
+        pending.add(executor.submit(
+            process_batch, batch, dsize, path_template, img_format, overlay_timestamp, interpolation,
+            jpeg_quality, jpeg_subsample, overlay_scale
+        ))
+
+    # Shared counter the workers use to pick distinct CPUs to pin themselves to
+    worker_counter = multiprocessing.Value("i", 0)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_cores, initializer=init_worker, initargs=(logging.getLogger().level, worker_counter)) as executor, tqdm(total=total_steps, desc="Extracting frames") as pbar:
+        for frame_index, frame in frames:
+            current_time = frame_index / fps
+            pbar.update(1)
+
+            if is_duplicate is not None and is_duplicate(frame):
+                skipped_count += 1
+                continue
             processed_count += 1
 
-            futures.append(
-                executor.submit(
-                    process_and_save,
-                    frame,
-                    saved_frame_count,
-                    scale_factor,
-                    output_folder,
-                    img_format,
-                    overlay_timestamp,
-                    current_time,
-                    INTERPOLATION_MAP.get(interpolation_method, cv2.INTER_LINEAR)
-                )
-            )
+            batch.append((frame, saved_frame_count, current_time))
             saved_frame_count += 1
+            if len(batch) == BATCH_SIZE:
+                submit_batch(executor, batch)
+                batch = []
 
-            # Skip frames using grab() for efficiency
-            for _ in range(skip_frames - 1):
-                if cap.grab():
-                    current_frame_index += 1
-                else:
-                    break
-            current_frame_index += 1
-            pbar.update(1)
+        if batch:
+            submit_batch(executor, batch)
 
-    concurrent.futures.wait(futures)
+    concurrent.futures.wait(pending)
     cap.release()
     print("Finished extracting frames.")
     print(f"Summary: Processed frames: {processed_count}, Saved frames: {saved_frame_count}, Skipped frames: {skipped_count}")
@@ -155,7 +600,7 @@ def extract_frames(
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
-        description="Extract frames from a video with scaling, multithreading, time range selection, duplicate frame skipping, timestamp overlay, interpolation options, and error tolerance."
+        description="Extract frames from a video with scaling, multiprocessing, time range selection, duplicate frame skipping, timestamp overlay, interpolation options, and error tolerance."
     )
     parser.add_argument("video_path", help="Path to the input video file.")
     parser.add_argument(
@@ -186,7 +631,13 @@ def parse_arguments():
         "--similarity_threshold",
         type=float,
         default=0.0,
-        help="If the mean squared error (MSE) between consecutive frames is less than this value, the frame is skipped. Use 0.0 to only skip completely identical frames; a reasonable value (e.g., 100.0) will skip frames with minor differences. Values significantly higher than 100.0 may skip even moderately different frames.",
+        help="If the mean squared error (MSE) between consecutive frames, computed on 64x64 thumbnails, is less than this value, the frame is skipped. Use 0.0 to only skip completely identical frames; a reasonable value (e.g., 100.0) will skip frames with minor differences. Values significantly higher than 100.0 may skip even moderately different frames.",
+    )
+    parser.add_argument(
+        "--similarity_metric",
+        choices=["mse", "dhash", "bitwise"],
+        default="mse",
+        help="How frames are compared: 'mse' compares each frame with the previous saved frame; 'dhash' compares 64-bit perceptual hashes against the last 16 saved frames, and the threshold is a Hamming distance (0-64, e.g. 5); 'bitwise' compares black/white thumbnails, and the threshold is the fraction of pixels that changed (0-1, e.g. 0.02).",
     )
     parser.add_argument(
         "--ignore_similarity",
@@ -195,13 +646,19 @@ def parse_arguments():
     )
     # New arguments
     parser.add_argument("--format", choices=["jpg", "png"], default="jpg", help="Image format for saved frames.")
+    parser.add_argument("--jpeg_quality", type=int, choices=range(1, 101), default=90, metavar="QUALITY", help="JPEG quality from 1 to 100 (default 90).")
+    parser.add_argument("--jpeg_subsample", choices=["420", "422", "444"], default="420", help="JPEG chroma subsampling (default 420, the fastest to encode).")
     parser.add_argument("--timestamp", action="store_true", help="Overlay frame timestamp on extracted images.")
-    parser.add_argument("--interpolation", choices=["linear", "nearest", "cubic", "area"], default="linear", help="Interpolation method to resize frames.")
+    parser.add_argument("--interpolation", choices=["auto", "linear", "nearest", "cubic", "area"], default="auto", help="Interpolation method to resize frames. 'auto' uses 'area' when downscaling and 'linear' otherwise.")
+    parser.add_argument("--backend", choices=["opencv", "ffmpeg"], default="opencv", help="Extract with OpenCV and a worker pool, or with a single FFmpeg filter graph through PyAV.")
+    parser.add_argument("--verbose", action="store_true", help="Log every saved frame.")
+    parser.add_argument("--device", choices=["cpu", "cuda"], default="cpu", help="Decode and resize on the CPU or on an NVIDIA GPU (requires OpenCV built with CUDA and cudacodec).")
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_arguments()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format=LOG_FORMAT)
     extract_frames(
         video_path=args.video_path,
         output_folder=args.output_folder,
@@ -213,5 +670,10 @@ if __name__ == "__main__":
         ignore_similarity=args.ignore_similarity,  # Passing the new flag
         img_format=args.format,
         overlay_timestamp=args.timestamp,
-        interpolation_method=args.interpolation
+        interpolation_method=args.interpolation,
+        similarity_metric=args.similarity_metric,
+        jpeg_quality=args.jpeg_quality,
+        jpeg_subsample=args.jpeg_subsample,
+        device=args.device,
+        backend=args.backend
     )